@@ -3,16 +3,74 @@ ScamAgent - Async AI agent for scam detection and intelligence extraction.
 Uses httpx.AsyncClient for non-blocking external API calls.
 """
 
-import json
 import os
 import re
 import logging
 import httpx
-from typing import List, Dict, Any, Optional
+import orjson
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Entity extraction patterns, compiled once at import
+UPI_RE = re.compile(r'[a-zA-Z0-9.\-_]{2,256}@[a-zA-Z]{2,64}')
+URL_RE = re.compile(r'(https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+)')
+BANK_RE = re.compile(r'\b\d{9,18}\b')
+PHONE_RE = re.compile(r'\b(?:\+?\d{1,3}[- ]?)?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}\b')
+# v1.3.0: ID Theft Detection - Aadhaar (12-digit patterns)
+AADHAAR_RE = re.compile(r'\b\d{4}[- ]?\d{4}[- ]?\d{4}\b')
+# v1.3.0: ID Theft Detection - PAN (5 letters, 4 digits, 1 letter: ABCDE1234F)
+PAN_RE = re.compile(r'\b[A-Z]{5}[0-9]{4}[A-Z]\b')
+OTP_RE = re.compile(r'\b\d{4,6}\b')
+DIGIT_RE = re.compile(r'\d')
+
+# Keyword fallback for detect_scam when the LLM is unavailable
+SCAM_FALLBACK_KEYWORDS = (
+    "verify", "blocked", "suspended", "upi", "win", "gift", "account",
+    "otp", "password", "cvv", "bank", "urgent", "immediate", "limited"
+)
+
+# Weighted scam indicators for the Tier 3 prefilter in main.py. All terms are matched in
+# a single pass by one alternation regex (longest terms first, word-bounded).
+SCAM_INDICATOR_WEIGHTS = {
+    # Credential / payment requests - strongest signal
+    "upi pin": 3, "secret pin": 3, "cvv": 3, "atm pin": 3, "net banking password": 3,
+    "otp": 2, "password": 2, "card number": 2, "card details": 2, "kyc": 2,
+    "aadhaar": 2, "aadhar": 2, "pan card": 2, "registration fee": 2, "processing fee": 2,
+    "lottery": 2, "jackpot": 2, "refund": 1, "cashback": 1, "prize": 1, "winner": 1,
+    "won": 1, "reward": 1, "gift": 1, "claim": 1,
+    # Threats and urgency
+    "blocked": 2, "suspended": 2, "deactivated": 2, "arrest": 2, "legal action": 2,
+    "verify": 1, "verification": 1, "urgent": 1, "urgently": 1, "immediately": 1,
+    "expire": 1, "expires": 1, "limited time": 1, "last chance": 1, "act now": 1,
+    "electricity": 1, "disconnected": 1,
+    # Payment rails and links
+    "upi": 1, "bank": 1, "account": 1, "click": 1, "link": 1, "http": 1, "bit.ly": 2,
+}
+SCAM_INDICATOR_RE = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(term) for term in sorted(SCAM_INDICATOR_WEIGHTS, key=len, reverse=True)
+    ) + r')\b'
+)
+
+# Static system message shared by every JSON-mode LLM call (built once, not per request)
+JSON_ONLY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a JSON-only response engine. Output raw JSON. No conversational text. No markdown blocks."
+}
+
+# List-valued entity fields of an intelligence dict, in response order
+INTEL_LIST_KEYS = (
+    "bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
+    "suspiciousKeywords", "aadhaarNumbers", "panNumbers"
+)
+
+# Sentinel returned by ScamAgent._cache_get on a miss
+_CACHE_MISS = object()
+
 
 def pre_process_message(message: str) -> Optional[Dict[str, Any]]:
     """
@@ -46,9 +104,8 @@ def pre_process_message(message: str) -> Optional[Dict[str, Any]]:
     has_dangerous = any(dangerous in message_lower for dangerous in dangerous_keywords)
     
     # OTP Pattern: 4-6 digit code with keywords
-    otp_pattern = r'\b\d{4,6}\b'
     otp_keywords = ['otp', 'verification', 'code', 'entered', 'submitted']
-    has_otp = re.search(otp_pattern, message) and any(kw in message_lower for kw in otp_keywords)
+    has_otp = OTP_RE.search(message) and any(kw in message_lower for kw in otp_keywords)
     
     if has_otp:
         # Check for PROTECTIVE first (Safe)
@@ -116,6 +173,111 @@ def pre_process_message(message: str) -> Optional[Dict[str, Any]]:
     return None  # No whitelist match - proceed to LLM analysis
 
 
+def build_full_text(message: str, history: List[Dict[str, Any]], max_turn_chars: int = 0) -> str:
+    """
+    Join conversation history and the current message into one analysis string.
+    
+    Callers that run several agent methods on the same turn should build this
+    once and pass it in via the ``full_text`` argument. ``max_turn_chars`` (0 =
+    no limit) cuts each history turn, never the current message; use it only for
+    prompt text, since the regex pass must see whole turns.
+    """
+    if not history:
+        return message
+    if max_turn_chars > 0:
+        history_text = " ".join(msg.get("text", "")[:max_turn_chars] for msg in history)
+    else:
+        history_text = " ".join(msg.get("text", "") for msg in history)
+    return f"{history_text} {message}"
+
+
+def scam_indicator_score(text: str) -> int:
+    """
+    Sum the weights of scam indicator terms found in the text (one regex pass).
+    
+    Args:
+        text: Message text to score
+    
+    Returns:
+        Total indicator weight (0 means no indicator terms at all)
+    """
+    return sum(SCAM_INDICATOR_WEIGHTS[m.group(0)] for m in SCAM_INDICATOR_RE.finditer(text.lower()))
+
+
+# (key, pattern, literal the pattern cannot match without; None = needs a digit)
+_ENTITY_EXTRACTORS = (
+    ("bankAccounts", BANK_RE, None),
+    ("upiIds", UPI_RE, "@"),
+    ("phishingLinks", URL_RE, "http"),
+    ("phoneNumbers", PHONE_RE, None),
+    ("aadhaarNumbers", AADHAAR_RE, None),
+    ("panNumbers", PAN_RE, None),
+)
+
+
+def extract_entities(text: str) -> Dict[str, List[str]]:
+    """
+    Run the regex entity extractors over a block of text.
+    
+    Each extractor has a literal it cannot match without ('@' for UPI IDs,
+    'http' for links, a digit for account/phone/Aadhaar/PAN), so a cheap
+    C-level substring check skips the full pattern scan when that literal
+    is absent. Ordinary chat text usually needs one scan instead of six.
+    
+    Args:
+        text: Text to scan (typically history + current message)
+    
+    Returns:
+        Dictionary of de-duplicated matches per entity type (first-seen order)
+    """
+    has_digits = DIGIT_RE.search(text) is not None
+    return {
+        key: list(dict.fromkeys(pattern.findall(text)))
+        if (has_digits if literal is None else literal in text) else []
+        for key, pattern, literal in _ENTITY_EXTRACTORS
+    }
+
+
+def extract_entities_batch(texts: List[str]) -> List[Dict[str, List[str]]]:
+    """
+    Run the regex entity extractors over many transcripts at once.
+    
+    Transcripts are packed into one newline-separated buffer with an offset
+    table. Each pattern then scans the buffer once (instead of once per
+    transcript) and every match is routed back to its transcript by bisecting
+    the offsets. None of the patterns can match across a newline, so the
+    results are identical to calling extract_entities() on each text.
+    
+    Args:
+        texts: Transcripts to scan
+    
+    Returns:
+        One entity dictionary per transcript, in input order
+    """
+    results: List[Dict[str, Dict[str, None]]] = [
+        {key: {} for key, _, _ in _ENTITY_EXTRACTORS} for _ in texts
+    ]
+    if not texts:
+        return []
+    
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    buffer = "\n".join(texts)
+    
+    has_digits = DIGIT_RE.search(buffer) is not None
+    for key, pattern, literal in _ENTITY_EXTRACTORS:
+        if not (has_digits if literal is None else literal in buffer):
+            continue
+        for match in pattern.finditer(buffer):
+            index = bisect_right(starts, match.start()) - 1
+            results[index][key][match.group(1) if pattern.groups else match.group(0)] = None
+    
+    return [{key: list(found) for key, found in result.items()} for result in results]
+
+
 def apply_evidence_guard(intel: Dict[str, Any]) -> Dict[str, Any]:
     """
     Evidence Guard: Post-processing safety override.
@@ -156,11 +318,11 @@ def apply_evidence_guard(intel: Dict[str, Any]) -> Dict[str, Any]:
     has_evidence = has_links or has_upi or has_bank
     
     current_score = risk_score
-    logger.info(f"EVIDENCE CHECK: score={current_score}, has_links={has_links}, has_upi={has_upi}, has_bank={has_bank}")
+    logger.debug("EVIDENCE CHECK: score=%s, has_links=%s, has_upi=%s, has_bank=%s", current_score, has_links, has_upi, has_bank)
     
     # If high risk but NO evidence, apply cap
     if current_score > 70 and not has_evidence:
-        logger.info(f"EVIDENCE GUARD TRIGGERED: High risk ({current_score}) but no physical evidence found - capping score")
+        logger.info("EVIDENCE GUARD TRIGGERED: High risk (%s) but no physical evidence found - capping score", current_score)
         # Update the intel object
         if hasattr(intel, '__setitem__'):
             intel["riskScore"] = 40
@@ -190,16 +352,102 @@ class ScamAgent:
         
         # Shared async HTTP client (will be initialized on first use)
         self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # Exact-match cache of extract_intelligence LLM output:
+        # (method, model, prompt text, sender) -> raw JSON string.
+        # Scam templates repeat heavily, so identical messages skip the round-trip.
+        self._llm_cache: "OrderedDict[Tuple[str, ...], Any]" = OrderedDict()
+        self._llm_cache_size = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+        self._cache_hits = 0
+        self._cache_misses = 0
+        
+        # Per-session regex state: sessionId -> ({entity type -> ordered set}, hashes of
+        # turn texts already scanned). Warm sessions only scan turns they haven't seen.
+        self._session_entities: "OrderedDict[str, Tuple[Dict[str, Dict[str, None]], Set[int]]]" = OrderedDict()
+        self._session_cache_size = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
     
     async def _get_http_client(self) -> httpx.AsyncClient:
-        """Get or create the async HTTP client."""
+        """Get or create the async HTTP client (pooled, HTTP/2 multiplexed)."""
         if self._http_client is None or self._http_client.is_closed:
             self._http_client = httpx.AsyncClient(
+                http2=True,
                 timeout=30.0,
-                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20)
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100)
             )
         return self._http_client
     
+    def _cache_get(self, key: Tuple[str, ...]) -> Any:
+        """Return a cached LLM result (refreshing its LRU position) or _CACHE_MISS."""
+        value = self._llm_cache.get(key, _CACHE_MISS)
+        if value is _CACHE_MISS:
+            self._cache_misses += 1
+        else:
+            self._cache_hits += 1
+            self._llm_cache.move_to_end(key)
+        return value
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """LLM cache counters since startup (hits, misses, hit rate, size)."""
+        lookups = self._cache_hits + self._cache_misses
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "hitRate": round(self._cache_hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._llm_cache)
+        }
+    
+    def _cache_put(self, key: Tuple[str, ...], value: Any) -> None:
+        """Store an LLM result, evicting the least recently used entry when full."""
+        if self._llm_cache_size <= 0:
+            return
+        self._llm_cache[key] = value
+        self._llm_cache.move_to_end(key)
+        if len(self._llm_cache) > self._llm_cache_size:
+            self._llm_cache.popitem(last=False)
+    
+    def _session_extract_entities(
+        self,
+        session_id: Optional[str],
+        message: str,
+        history: List[Dict[str, Any]]
+    ) -> Dict[str, List[str]]:
+        """
+        Regex-extract entities incrementally per session.
+        
+        The first request of a session scans the whole transcript; later requests
+        scan only the history turns not scanned before (e.g. the other party's
+        turns the client adds to conversationHistory) plus the new message, and
+        union the result with what the session already produced. This keeps regex
+        work O(N) over a conversation instead of O(N^2).
+        """
+        if not session_id or self._session_cache_size <= 0:
+            return extract_entities(build_full_text(message, history))
+        
+        turn_texts = [msg.get("text", "") for msg in history]
+        state = self._session_entities.get(session_id)
+        if state is None:
+            seen = {key: dict.fromkeys(values) for key, values in extract_entities(build_full_text(message, history)).items()}
+            scanned = {hash(text) for text in turn_texts}
+            scanned.add(hash(message))
+            self._session_entities[session_id] = (seen, scanned)
+            if len(self._session_entities) > self._session_cache_size:
+                self._session_entities.popitem(last=False)
+        else:
+            seen, scanned = state
+            self._session_entities.move_to_end(session_id)
+            new_texts = [text for text in turn_texts if hash(text) not in scanned]
+            scanned.update(hash(text) for text in new_texts)
+            scanned.add(hash(message))
+            new_texts.append(message)
+            for key, values in extract_entities(" ".join(new_texts)).items():
+                seen[key].update(dict.fromkeys(values))
+        
+        return {key: list(values) for key, values in seen.items()}
+    
+    async def start(self):
+        """Create the shared HTTP client at startup so the first request doesn't pay for it."""
+        await self._get_http_client()
+    
     async def close(self):
         """Close the HTTP client."""
         if self._http_client and not self._http_client.is_closed:
@@ -208,7 +456,8 @@ class ScamAgent:
     async def _call_llm_api(
         self,
         messages: List[Dict[str, str]],
-        response_as_json: bool = False
+        response_as_json: bool = False,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Call OpenRouter LLM API asynchronously using httpx.
@@ -216,6 +465,7 @@ class ScamAgent:
         Args:
             messages: List of message dictionaries in OpenAI format
             response_as_json: Flag indicating JSON response is expected
+            max_tokens: Cap on generated tokens (bounds generation latency)
             
         Returns:
             JSON response from the LLM API
@@ -237,6 +487,8 @@ class ScamAgent:
             "messages": messages,
             "temperature": 0,
         }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
         
         # Fix 2: Strict JSON Enforcement - Add response_format for JSON mode
         if response_as_json:
@@ -245,14 +497,18 @@ class ScamAgent:
         response = await client.post(
             self.openrouter_url,
             headers=headers,
-            json=payload
+            content=orjson.dumps(payload)
         )
         if response.status_code != 200:
-            logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
+            logger.error("OpenRouter API error: %s - %s", response.status_code, response.text)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
-    async def detect_scam(self, message: str, history: List[Dict[str, Any]]) -> bool:
+    async def detect_scam(
+        self,
+        message: str,
+        history: List[Dict[str, Any]]
+    ) -> bool:
         """
         Detect if a message contains scam intent using LLM analysis.
         
@@ -284,82 +540,35 @@ class ScamAgent:
         """
         
         messages = [
-            {"role": "system", "content": "You are a JSON-only response engine. Output raw JSON. No conversational text. No markdown blocks."},
+            JSON_ONLY_SYSTEM_MESSAGE,
             {"role": "user", "content": prompt}
         ]
         
         try:
-            llm_response = await self._call_llm_api(messages)
+            # Only 'true'/'false' is needed, so cap generation at a few tokens
+            llm_response = await self._call_llm_api(messages, max_tokens=5)
             result = llm_response["choices"][0]["message"]["content"].strip().lower()
             return result == 'true'
         except Exception as e:
-            logger.warning(f"LLM scam detection failed: {e}. Falling back to keyword matching.")
+            logger.warning("LLM scam detection failed: %s. Falling back to keyword matching.", e)
             # Fallback to keyword matching if API fails
-            keywords = ["verify", "blocked", "suspended", "upi", "win", "gift", "account",
-                       "otp", "password", "cvv", "bank", "urgent", "immediate", "limited"]
-            return any(k in message.lower() for k in keywords)
-    
-    async def generate_response(
-        self,
-        message: str,
-        history: List[Dict[str, Any]],
-        metadata: Dict[str, Any]
-    ) -> str:
-        """
-        Generate a short professional Summary Verdict for the scanner app.
-        
-        Args:
-            message: The incoming message to analyze
-            history: Conversation history
-            metadata: Channel and language metadata
-            
-        Returns:
-            Short professional verdict string (e.g., 'Phishing attempt targeting HDFC users via UPI')
-        """
-        # Build context from history
-        all_messages = [msg.get("text", "") for msg in history] + [message]
-        full_text = " ".join(all_messages)
-        
-        llm_prompt = f"""
-        You are a Professional Security Analyst.
-        Analyze this message and provide a Summary Verdict (MAX 15 WORDS).
-        
-        Message: "{full_text}"
-        
-        Rules:
-        1. STRICTLY MAX 15 WORDS
-        2. Format: "[Threat Type] - [Target/Description]"
-        3. Examples:
-           - "Phishing - HDFC account compromise attempt via OTP"
-           - "Lottery scam - fake prize claim requesting bank details"
-           - "Tech support - false account suspension warning"
-           - "Safe - No malicious content detected"
-           - "Neutral - Analysis inconclusive"
-        4. NO conversational filler (no 'Hello', no 'I think', no 'In my opinion')
-        5. Be direct and professional
-        
-        Return ONLY the summary verdict. No explanation.
-        """
-        
-        messages = [{"role": "user", "content": llm_prompt}]
-        
-        try:
-            llm_response = await self._call_llm_api(messages)
-            return llm_response["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            logger.warning(f"LLM verdict generation failed: {e}. Returning default.")
-            return "Neutral - Analysis inconclusive due to system error"
+            message_lower = message.lower()
+            return any(k in message_lower for k in SCAM_FALLBACK_KEYWORDS)
     
     async def extract_intelligence(
         self,
         message: str,
         history: List[Dict[str, Any]],
-        sender_id: str = None
+        sender_id: str = None,
+        full_text: Optional[str] = None,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Extract actionable intelligence from scammer messages.
         
         Uses both regex patterns and LLM analysis for comprehensive extraction.
+        The LLM's JSON is cached by prompt text and sender; regex entities are
+        per session and are merged in fresh on every call, cache hit or not.
         The risk scoring system analyzes multiple factors:
         
         RISK SCORING LOGIC (0-100 scale):
@@ -379,8 +588,11 @@ class ScamAgent:
         
         Args:
             message: Current message to analyze
-            history: Previous messages in conversation
+            history: Previous messages in conversation (scanned in full by the regex pass)
             sender_id: Sender's phone number (optional, for verification)
+            full_text: History + message text for the LLM prompt; callers may pass
+                a trimmed window here (built from the full history if omitted)
+            session_id: Enables incremental per-session regex extraction
             
         Returns:
             Dictionary containing:
@@ -400,36 +612,20 @@ class ScamAgent:
         # =====================================================================
         whitelist_result = pre_process_message(message)
         if whitelist_result:
-            logger.info(f"Whitelist match: {whitelist_result['scamType']} - skipping LLM")
+            logger.info("Whitelist match: %s - skipping LLM", whitelist_result['scamType'])
             return whitelist_result
         
         # =====================================================================
         # STEP 2: LLM Analysis (only if no whitelist match)
         # =====================================================================
         # Combine all text for analysis
-        all_messages = [msg.get("text", "") for msg in history] + [message]
-        full_text = " ".join(all_messages)
+        if full_text is None:
+            full_text = build_full_text(message, history)
         
-        # Regex-based extraction patterns
-        upi_pattern = r'[a-zA-Z0-9.\-_]{2,256}@[a-zA-Z]{2,64}'
-        url_pattern = r'(https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+)'
-        bank_pattern = r'\b\d{9,18}\b'
-        phone_pattern = r'\b(?:\+?\d{1,3}[- ]?)?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}\b'
-        
-        # v1.3.0: ID Theft Detection - Aadhaar (12-digit patterns)
-        aadhaar_pattern = r'\b\d{4}[- ]?\d{4}[- ]?\d{4}\b'
-        # v1.3.0: ID Theft Detection - PAN (5 letters, 4 digits, 1 letter: ABCDE1234F)
-        pan_pattern = r'\b[A-Z]{5}[0-9]{4}[A-Z]\b'
-        
-        # Initialize intelligence dictionary
+        # Initialize intelligence dictionary (regex-based extraction)
         # v1.3.0: Added aadhaarNumbers and panNumbers for ID theft detection
         intel = {
-            "bankAccounts": list(set(re.findall(bank_pattern, full_text))),
-            "upiIds": list(set(re.findall(upi_pattern, full_text))),
-            "phishingLinks": list(set(re.findall(url_pattern, full_text))),
-            "phoneNumbers": list(set(re.findall(phone_pattern, full_text))),
-            "aadhaarNumbers": list(set(re.findall(aadhaar_pattern, full_text))),
-            "panNumbers": list(set(re.findall(pan_pattern, full_text))),
+            **self._session_extract_entities(session_id, message, history),
             "suspiciousKeywords": [],
             "agentNotes": "",
             # New enhanced fields
@@ -507,29 +703,41 @@ class ScamAgent:
         """
         
         messages = [
-            {"role": "system", "content": "You are a JSON-only response engine. Output raw JSON. No conversational text. No markdown blocks."},
+            JSON_ONLY_SYSTEM_MESSAGE,
             {"role": "user", "content": llm_prompt}
         ]
         
+        # Keyed on the exact prompt text: case-sensitive entities (short-link paths,
+        # UPI handles) must not be served from another session's cached result
+        cache_key = ("extract_intelligence", self.model, full_text, sender_id or "")
+        
         try:
-            llm_response = await self._call_llm_api(messages, response_as_json=True)
-            content = llm_response["choices"][0]["message"]["content"].strip()
-            
-            # Extract JSON from response using regex
-            json_match = re.search(r'(\{.*\})', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(1).strip()
+            content = self._cache_get(cache_key)
+            cache_hit = content is not _CACHE_MISS
+            if cache_hit:
+                logger.debug("extract_intelligence cache hit")
+            else:
+                llm_response = await self._call_llm_api(messages, response_as_json=True)
+                content = llm_response["choices"][0]["message"]["content"].strip()
+                
+                # Extract the outermost {...} from the response (plain C-level scans, no regex)
+                start = content.find('{')
+                end = content.rfind('}')
+                if start != -1 and end > start:
+                    content = content[start:end + 1]
             
             try:
-                llm_intel = json.loads(content)
+                llm_intel = orjson.loads(content)
                 
                 # Merge with regex results
                 if isinstance(llm_intel, dict):
-                    for key in ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords", "aadhaarNumbers", "panNumbers"]:
+                    # Cache completed analyses as raw JSON, so every hit parses into
+                    # fresh objects that callers are free to mutate
+                    if not cache_hit:
+                        self._cache_put(cache_key, content)
+                    for key in INTEL_LIST_KEYS:
                         if key in llm_intel:
-                            existing = set(intel.get(key, []))
-                            new_items = set(llm_intel.get(key, []))
-                            intel[key] = list(existing.union(new_items))
+                            intel[key] = list(dict.fromkeys([*intel.get(key, []), *llm_intel.get(key, [])]))
                     
                     if llm_intel.get("agentNotes"):
                         intel["agentNotes"] = llm_intel["agentNotes"]
@@ -544,18 +752,18 @@ class ScamAgent:
                     if llm_intel.get("extractedEntities"):
                         intel["extractedEntities"] = llm_intel["extractedEntities"]
                         
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON Decode Error: {e}")
-                logger.debug(f"RAW OUTPUT: {content[:200]}...")
+            except orjson.JSONDecodeError as e:
+                logger.warning("JSON Decode Error: %s", e)
+                logger.debug("RAW OUTPUT: %s...", content[:200])
                 # Continue with regex-only results
                 
         except Exception as e:
-            logger.warning(f"LLM intelligence extraction failed: {e}. Using regex-only results.")
+            logger.warning("LLM intelligence extraction failed: %s. Using regex-only results.", e)
             if not intel.get("agentNotes"):
                 intel["agentNotes"] = "Manual extraction used due to API error or malformed LLM response."
         
         # Ensure all required keys are present
-        for key in ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords", "aadhaarNumbers", "panNumbers"]:
+        for key in INTEL_LIST_KEYS:
             if key not in intel:
                 intel[key] = []
         if "agentNotes" not in intel or not intel["agentNotes"]:
@@ -574,7 +782,7 @@ class ScamAgent:
             entities.extend(intel.get("upiIds", []))
             entities.extend(intel.get("phoneNumbers", []))
             entities.extend(intel.get("phishingLinks", []))
-            intel["extractedEntities"] = list(set(entities))
+            intel["extractedEntities"] = list(dict.fromkeys(entities))
         
         # Add threatSource if sender_id provided
         if sender_id:
@@ -60,9 +60,7 @@ class InMemoryStorage:
         intel = self._conversations[session_id]["intelligence"]
         for key in ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers", "suspiciousKeywords"]:
             if key in intelligence:
-                existing = set(intel.get(key, []))
-                new_items = set(intelligence.get(key, []))
-                intel[key] = list(existing.union(new_items))
+                intel[key] = list(dict.fromkeys([*intel.get(key, []), *intelligence.get(key, [])]))
         
         if intelligence.get("agentNotes"):
             intel["agentNotes"] = intelligence["agentNotes"]
@@ -125,12 +123,12 @@ class DatabaseManager:
             logger.info("SUCCESS: Connected to MongoDB Atlas")
             return True
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-            logger.warning(f"ERROR: Database connection failed ({e}), using fallback")
+            logger.warning("ERROR: Database connection failed (%s), using fallback", e)
             self._use_in_memory = True
             self.client = None
             return False
         except Exception as e:
-            logger.error(f"ERROR: Unexpected database error ({e}), using fallback")
+            logger.error("ERROR: Unexpected database error (%s), using fallback", e)
             self._use_in_memory = True
             return False
     
@@ -148,7 +146,7 @@ class DatabaseManager:
             await self.client.admin.command("ping")
             return True
         except Exception as e:
-            logger.warning(f"MongoDB connection lost: {e}. Switching to in-memory.")
+            logger.warning("MongoDB connection lost: %s. Switching to in-memory.", e)
             self._use_in_memory = True
             return False
     
@@ -163,7 +161,7 @@ class DatabaseManager:
                 conversation["_id"] = str(conversation["_id"])  # Convert ObjectId to string
             return conversation
         except Exception as e:
-            logger.error(f"Error fetching conversation: {e}")
+            logger.error("Error fetching conversation: %s", e)
             await self.verify_connection()
             return await self.in_memory.get_conversation(session_id)
     
@@ -214,10 +212,10 @@ class DatabaseManager:
                 "messageCount": 0
             }
             result = await self.db.scam_logs.insert_one(conversation_doc)
-            logger.info(f"Document inserted with ID: {result.inserted_id}")
+            logger.info("Document inserted with ID: %s", result.inserted_id)
             return True
         except Exception as e:
-            logger.error(f"Error saving conversation: {e}")
+            logger.error("Error saving conversation: %s", e)
             await self.verify_connection()
             await self.in_memory.save_conversation(session_id, conversation_doc)
             return False
@@ -305,7 +303,7 @@ class DatabaseManager:
             return result.modified_count > 0 or result.upserted_id is not None
             
         except Exception as e:
-            logger.error(f"Error updating conversation: {e}")
+            logger.error("Error updating conversation: %s", e)
             await self.verify_connection()
             await self.in_memory.update_conversation(session_id, new_messages, intelligence)
             return False
@@ -331,7 +329,7 @@ class DatabaseManager:
                 results.append(doc)
             return results
         except Exception as e:
-            logger.error(f"Error fetching all intelligence: {e}")
+            logger.error("Error fetching all intelligence: %s", e)
             await self.verify_connection()
             return await self.in_memory.get_all_intelligence()
     
@@ -16,16 +16,19 @@ import asyncio
 import logging
 import re
 import secrets
+import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set
 from collections import defaultdict
 from time import time
 
+import anyio.to_thread
 import httpx
-from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Depends, Request
+import orjson
+from fastapi import FastAPI, HTTPException, Header, Depends, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import ValidationError
 
@@ -35,9 +38,15 @@ from slowapi.errors import RateLimitExceeded
 
 API_VERSION = "2.1.0"
 
-from models import HoneypotRequest, HoneypotResponse, IntelligenceData
+from models import (
+    HoneypotRequest, HoneypotResponse, IntelligenceData,
+    BatchExtractRequest, BatchExtractResponse
+)
 from database import db_manager
-from agent import ScamAgent, apply_evidence_guard
+from agent import (
+    ScamAgent, apply_evidence_guard, build_full_text, extract_entities_batch,
+    scam_indicator_score, PHONE_RE, UPI_RE, INTEL_LIST_KEYS
+)
 
 # v1.2 Titanium: Rate Limiting with slowapi (10 requests per minute per IP)
 # Using memory storage to avoid Redis dependency on Render
@@ -111,9 +120,12 @@ def normalize_input(text: str) -> str:
     
     return text.strip()
 
-# Configure logging
+# Worker threads for sync work offloaded by Starlette/anyio (per process)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "128"))
+
+# Configure logging (LOG_LEVEL=DEBUG adds per-request payload dumps)
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
@@ -133,8 +145,12 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("[FALLBACK] Database connection failed, using in-memory storage")
     
-    # Pre-initialize the ScamAgent
+    # Pre-initialize the ScamAgent and its pooled LLM client
     app.state.agent = ScamAgent()
+    await app.state.agent.start()
+    
+    # Starlette runs sync dependencies/handlers on anyio's pool (40 threads by default)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
     
     logger.info("Application started successfully")
     
@@ -142,7 +158,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down...")
+    await drain_background_tasks()
     await app.state.agent.close()
+    await close_callback_client()
     await db_manager.close()
     logger.info("Application shutdown complete")
 
@@ -152,12 +170,12 @@ app = FastAPI(
     title="Agentic AI Honeypot API",
     description="Real-time scam engagement and intelligence extraction system",
     version=API_VERSION,
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # v1.2 Titanium: Attach rate limiter to app
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # v1.2 Titanium: CORS Configuration - Restricted Origins
 # =============================================================================
@@ -191,8 +209,15 @@ app.add_middleware(
 # Configuration from environment
 # API_KEY must be set in environment variables
 EXPECTED_KEY = os.getenv("API_KEY", "")
+# Encoded once; compare_digest on bytes also accepts non-ASCII header values
+EXPECTED_KEY_BYTES = EXPECTED_KEY.encode("utf-8")
 GUVI_CALLBACK_URL = os.getenv("GUVI_CALLBACK_URL", "")
 DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+# Rolling window of history turns sent to the LLM (prompt cost grows with every turn)
+MAX_HISTORY_TURNS = int(os.getenv("MAX_HISTORY_TURNS", "8"))
+# Per-turn character cap for those turns in the LLM prompt (the current message
+# is never cut, and regex extraction always sees whole turns)
+MAX_HISTORY_CHARS = int(os.getenv("MAX_HISTORY_CHARS", "500"))
 
 # Default intelligence template for consistent API responses
 # v1.3.0: Added aadhaarNumbers and panNumbers
@@ -213,11 +238,54 @@ DEFAULT_INTEL = {
     "isPhishing": False
 }
 
+# Constant early-return bodies, serialized once at import. Handlers wrap them in a
+# fresh Response per request: middleware (CORS) appends headers to the response
+# object, so a shared instance would accumulate them across requests.
+SHORT_INPUT_BODY = orjson.dumps({
+    "status": "success",
+    "reply": "✅ Safe: Input too short for analysis",
+    "intelligence": {
+        **DEFAULT_INTEL,
+        "agentNotes": "Input too short for analysis",
+        "riskScore": 0,
+        "threatSource": ""
+    }
+})
+NO_ANALYSIS_BODY = orjson.dumps({
+    "status": "success",
+    "reply": "✅ Safe: Analysis complete",
+    "intelligence": {
+        **DEFAULT_INTEL,
+        "agentNotes": "Message does not require AI analysis",
+        "scamType": "Safe/Transactional",
+        "riskScore": 5,
+        "urgencyLevel": "Low"
+    }
+})
+
+# Verdicts and extracted intel are per message, so proxies and clients must not
+# cache any /message response. handle_message sets this on every return path, and
+# the exception handlers and verify_api_key set it on 401/422/429/400/500 errors.
+NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+
+def prebuilt_json_response(body: bytes) -> Response:
+    """Wrap a pre-serialized JSON body in a new Response (never reuse the instance)."""
+    return Response(content=body, media_type="application/json", headers=NO_STORE_HEADERS)
+
 
 # =============================================================================
 # Exception Handlers
 # =============================================================================
 
+@app.exception_handler(RateLimitExceeded)
+async def rate_limit_exceeded_handler(request, exc):
+    """Handle slowapi rate limit errors (slowapi's 429 body plus no-store)."""
+    response = _rate_limit_exceeded_handler(request, exc)
+    response.headers.update(NO_STORE_HEADERS)
+    return response
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc):
     """Handle Pydantic validation errors."""
@@ -232,14 +300,15 @@ async def validation_exception_handler(request, exc):
         return obj
     
     errors = convert_to_serializable(exc.errors())
-    logger.warning(f"Validation error: {errors}")
+    logger.warning("Validation error: %s", errors)
     return JSONResponse(
         status_code=422,
         content={
             "status": "error",
             "error": "Validation error",
             "details": errors
-        }
+        },
+        headers=NO_STORE_HEADERS
     )
 
 
@@ -252,21 +321,23 @@ async def value_error_handler(request, exc):
             "status": "error",
             "error": "Invalid value",
             "message": str(exc)
-        }
+        },
+        headers=NO_STORE_HEADERS
     )
 
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler for unexpected errors."""
-    logger.exception(f"Unexpected error: {exc}")
+    logger.exception("Unexpected error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={
             "status": "error",
             "error": "Internal server error",
             "message": "An unexpected error occurred" if not DEBUG else str(exc)
-        }
+        },
+        headers=NO_STORE_HEADERS
     )
 
 
@@ -298,22 +369,35 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
     # Handle missing or empty API key
     if not x_api_key:
         logger.debug("API Key validation failed: Missing header")
-        raise HTTPException(status_code=401, detail="Invalid or missing API Key")
+        raise HTTPException(status_code=401, detail="Invalid or missing API Key", headers=NO_STORE_HEADERS)
     
     # Strip whitespace from provided key
     provided_key = x_api_key.strip()
     
     # Log key lengths for debugging (only in debug level to keep logs clean)
-    logger.debug(f"Security: Expected key len={len(EXPECTED_KEY)}, Received key len={len(provided_key)}")
+    logger.debug("Security: Expected key len=%d, Received key len=%d", len(EXPECTED_KEY), len(provided_key))
     
-    # v1.2 Titanium: Constant-time comparison to prevent timing attacks
-    if not secrets.compare_digest(provided_key, EXPECTED_KEY):
-        logger.debug(f"API Key validation failed: Key mismatch")
-        raise HTTPException(status_code=401, detail="Invalid or missing API Key")
+    # v1.2 Titanium: Constant-time comparison to prevent timing attacks.
+    # Compared as UTF-8 bytes: str comparison raises TypeError on non-ASCII input.
+    if not secrets.compare_digest(provided_key.encode("utf-8"), EXPECTED_KEY_BYTES):
+        logger.debug("API Key validation failed: Key mismatch")
+        raise HTTPException(status_code=401, detail="Invalid or missing API Key", headers=NO_STORE_HEADERS)
     
     return provided_key
 
 
+async def get_agent(request: Request) -> ScamAgent:
+    """
+    Dependency returning the process-wide ScamAgent created in the lifespan hook.
+    
+    Routes depend on this instead of reaching into app.state directly, so there is
+    exactly one agent (and one set of HTTP clients/caches) per process and tests
+    can swap it via app.dependency_overrides. Declared async to avoid a
+    threadpool hop per request.
+    """
+    return request.app.state.agent
+
+
 def levenshtein_distance(s1: str, s2: str) -> int:
     """
     Calculate the Levenshtein distance between two strings.
@@ -528,7 +612,12 @@ def check_tier2_deterministic_traps(message_text: str) -> Optional[Dict[str, Any
     return None
 
 
-def check_tier3_llm_heuristics(message_text: str) -> bool:
+# Tier 3 prefilter: links, long digit runs and short-link domains that hint at a scam
+# even when no indicator keyword is present (compiled once at import)
+SCAM_HINT_RE = re.compile(r'(?i)https?://|www\.|bit\.ly|tinyurl|\d{6,}')
+
+
+def check_tier3_llm_heuristics(message_text: str, has_history: bool = False) -> bool:
     """
     Tier 3: LLM Heuristics - Determine if AI detection is needed.
     
@@ -537,6 +626,7 @@ def check_tier3_llm_heuristics(message_text: str) -> bool:
     
     Args:
         message_text: Normalized message text to analyze
+        has_history: Whether the message is part of an ongoing conversation
     
     Returns:
         bool: True if AI detection should run, False if message is clearly safe
@@ -552,9 +642,96 @@ def check_tier3_llm_heuristics(message_text: str) -> bool:
     if text_lower.strip() in simple_responses:
         return False
     
+    # Prefilter: an opening message with no scam indicator terms, links, phone
+    # numbers or UPI handles never needs the LLM. Follow-ups are always analyzed
+    # since their meaning depends on the earlier turns.
+    if not has_history and not (
+        scam_indicator_score(text_lower)
+        or SCAM_HINT_RE.search(message_text)
+        or UPI_RE.search(message_text)
+        or PHONE_RE.search(message_text)
+    ):
+        return False
+    
     return True
 
 
+# Entity lists that are deduplicated before the response (Fix 3: Entity Deduplication)
+DEDUP_INTEL_KEYS = ("upiIds", "phishingLinks")
+
+
+def ensure_list(val):
+    """
+    Deep Flat Sanitizer - Recursive schema guardian for AI-generated data.
+    
+    LLMs return probabilistic output that often violates Pydantic schema requirements,
+    causing 400 Bad Request errors. This function recursively traverses nested
+    structures (lists of lists, dict-wrapped values, MongoDB $addToSet artifacts)
+    and extracts only string values into a flat list.
+    
+    TRANSFORMATION MATRIX:
+    ----------------------
+    Input Type              | Output
+    ------------------------|---------------------------
+    [['url1', 'url2']]      | ['url1', 'url2']
+    [{'link': 'url1'}]      | ['url1']
+    {'0': 'link1', '1': ...}| ['link1', ...]
+    'string'                | [] (strings not in list)
+    None                    | []
+    123 (int)               | [] (non-strings ignored)
+    
+    ALGORITHM:
+    ----------
+    1. Initialize empty result list
+    2. Define recursive flatten() helper:
+       - If list: recurse on each element
+       - If dict: recurse on each value (ignore keys)
+       - If string: append to result
+       - Else: ignore (numbers, booleans, None)
+    3. Execute flatten(val) and return result
+    
+    USE CASES:
+    ----------
+    - MongoDB $addToSet operations requiring array input for $each
+    - Pydantic model validation requiring List[str] types
+    - React Native/Expo frontend compatibility (flat JSON arrays)
+    - AI output sanitization before database persistence
+    
+    Args:
+        val: Any value from AI extraction or database query.
+             Commonly: list, dict, nested list, None, or unexpected types.
+    
+    Returns:
+        List[str]: Flat list containing only string values extracted from
+                  nested structures. Guaranteed never nested, never containing
+                  dicts, and always iterable by React Native FlatList.
+    
+    Example:
+        >>> ensure_list([['netflix.com', 'evil.com']])
+        ['netflix.com', 'evil.com']
+        >>> ensure_list({'link': 'phishing.com', 'upi': 'user@upi'})
+        ['phishing.com', 'user@upi']
+    """
+    if val is None:
+        return []
+    
+    result = []
+    
+    def flatten(item):
+        if isinstance(item, list):
+            for subitem in item:
+                flatten(subitem)
+        elif isinstance(item, dict):
+            for subval in item.values():
+                flatten(subval)
+        elif isinstance(item, str):
+            result.append(item)
+        # Ignore numbers, booleans, etc.
+    
+    flatten(val)
+    return result
+
+
 def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str = "") -> tuple:
     """
     THE FINAL THREE - Ultimate sanitization block before response delivery.
@@ -606,7 +783,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
     initial_risk = intel.get("riskScore") or 0
     if initial_risk >= 60:
         # Whitelist already detected high risk - preserve it
-        logger.info(f"PRESERVING WHITELIST HIGH RISK: {initial_risk}")
+        logger.info("PRESERVING WHITELIST HIGH RISK: %s", initial_risk)
         intel["isPhishing"] = True
         reply = f"❌ Danger: {intel.get('agentNotes', 'High risk detected')}"
         return intel, reply
@@ -642,7 +819,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
     # Distinguish malicious intent vs protective intent in OTP messages
     # =========================================================================
     has_otp = "otp" in message_lower or "verification code" in message_lower
-    has_links_or_upi = len(phishing_links) > 0 or len(upi_ids) > 0
+    has_links_or_upi = bool(phishing_links or upi_ids)
     
     # Malicious intent keywords (social engineering)
     malicious_intent = any(kw in message_lower for kw in [
@@ -704,7 +881,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["urgent language"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Social Engineering: Urgent verbal commands detected]"
-        logger.info(f"SOCIAL ENGINEERING TRIGGERED: Urgent language without links - Risk 60")
+        logger.info("SOCIAL ENGINEERING TRIGGERED: Urgent language without links - Risk 60")
     elif has_urgent_language and has_otp:
         # Urgent + OTP = CRITICAL - Risk 100
         intel["riskScore"] = 100
@@ -737,7 +914,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
     # Check for actual Aadhaar/PAN numbers in message
     aadhaar_numbers = intel.get("aadhaarNumbers", [])
     pan_numbers = intel.get("panNumbers", [])
-    has_id_numbers = len(aadhaar_numbers) > 0 or len(pan_numbers) > 0
+    has_id_numbers = bool(aadhaar_numbers or pan_numbers)
     
     if (has_id_request and has_photo_request) or (has_id_request and has_id_numbers):
         # Request for ID photo or ID numbers = High Danger
@@ -747,7 +924,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["id theft"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [ID Theft: Government ID request detected]"
-        logger.info(f"ID THEFT TRIGGERED: Aadhaar/PAN request detected - Risk 80")
+        logger.info("ID THEFT TRIGGERED: Aadhaar/PAN request detected - Risk 80")
     elif has_id_request:
         # General ID request without photo
         intel["riskScore"] = max(intel.get("riskScore", 0), 60)
@@ -814,9 +991,9 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["scamType"] = "Brand Impersonation"
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["brand lookalike"]
-        intel["phishingLinks"] = list(set(intel.get("phishingLinks", []) + lookalike_links))
+        intel["phishingLinks"] = list(dict.fromkeys([*intel.get("phishingLinks", []), *lookalike_links]))
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Brand Lookalike: Typo-squatting detected]"
-        logger.info(f"BRAND LOOKALIKE TRIGGERED: {lookalike_links} - Risk 75")
+        logger.info("BRAND LOOKALIKE TRIGGERED: %s - Risk 75", lookalike_links)
     
     # =========================================================================
     # v1.3.1 STRICT HEURISTIC OVERRIDES - Final Safety Gate
@@ -841,7 +1018,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["otp data request"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Override: OTP Data Request - Risk 60]"
-        logger.info(f"OVERRIDE OTP DATA REQUEST: Risk forced to 60+")
+        logger.info("OVERRIDE OTP DATA REQUEST: Risk forced to 60+")
         reply = "❌ Danger: OTP data request scam detected"
         return intel, reply
     
@@ -864,7 +1041,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["financial data request"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Override: Financial Data Request - Risk 75]"
-        logger.info(f"OVERRIDE FINANCIAL DATA REQUEST: Risk forced to 75+")
+        logger.info("OVERRIDE FINANCIAL DATA REQUEST: Risk forced to 75+")
     
     # -------------------------------------------------------------------------
     # RULE 9: ID Theft KYC Override
@@ -886,7 +1063,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["id theft kyc"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Override: ID Theft KYC Request - Risk 65-75]"
-        logger.info(f"OVERRIDE ID THEFT KYC: Risk forced to 65-75")
+        logger.info("OVERRIDE ID THEFT KYC: Risk forced to 65-75")
     
     # -------------------------------------------------------------------------
     # RULE 10: Urgency Multiplier
@@ -898,7 +1075,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
     has_urgency_topic = any(kw in message_lower for kw in urgency_multiplier_keywords)
     has_urgency_action = any(kw in message_lower for kw in urgency_action_keywords)
     phone_numbers = intel.get("phoneNumbers", [])
-    has_phone_or_link = len(phone_numbers) > 0 or len(phishing_links) > 0
+    has_phone_or_link = bool(phone_numbers or phishing_links)
     
     if has_urgency_topic and has_urgency_action and has_phone_or_link:
         # Add +20 to current risk
@@ -908,7 +1085,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["urgency multiplier"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [Override: Urgency Multiplier +20]"
-        logger.info(f"OVERRIDE URGENCY MULTIPLIER: +20 Risk added")
+        logger.info("OVERRIDE URGENCY MULTIPLIER: +20 Risk added")
     
     # =========================================================================
     # v1.3.4 SAFE-PASS OVERRIDE GATES (Highest Priority - BEFORE PIN Trap)
@@ -931,7 +1108,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "Low"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["official status"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [SAFE-PASS: Official Status Gate - Risk 12]"
-        logger.info(f"SAFE-PASS OFFICIAL STATUS: Official status with government ID detected - Risk 12, STOP")
+        logger.info("SAFE-PASS OFFICIAL STATUS: Official status with government ID detected - Risk 12, STOP")
         reply = "✅ Safe: Official status confirmation detected"
         return intel, reply
     
@@ -958,7 +1135,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "Low"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["whitelisted domain"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [SAFE-PASS: Root Domain Whitelist - Risk capped at 15]"
-        logger.info(f"SAFE-PASS ROOT DOMAIN: Whitelisted domain detected - Risk capped at 15")
+        logger.info("SAFE-PASS ROOT DOMAIN: Whitelisted domain detected - Risk capped at 15")
         # Don't return early - continue processing but with capped risk
     
     # -------------------------------------------------------------------------
@@ -981,7 +1158,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "Low"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["professional context"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [SAFE-PASS: Professional Context - Risk 10]"
-        logger.info(f"SAFE-PASS PROFESSIONAL: Trusted corporate domain detected - Risk 10")
+        logger.info("SAFE-PASS PROFESSIONAL: Trusted corporate domain detected - Risk 10")
         reply = "✅ Safe: Professional correspondence detected"
         return intel, reply
     
@@ -1003,7 +1180,7 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "High"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["pin trap"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [OVERRIDE: PIN/Credential Trap - Risk 95]"
-        logger.info(f"OVERRIDE PIN TRAP: PIN/Credential request detected - Risk forced to 95")
+        logger.info("OVERRIDE PIN TRAP: PIN/Credential request detected - Risk forced to 95")
         reply = "❌ Danger: PIN/Credential theft attempt detected"
         return intel, reply
     
@@ -1027,19 +1204,19 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
         intel["urgencyLevel"] = "Low"
         intel["suspiciousKeywords"] = intel.get("suspiciousKeywords", []) + ["government confirmation"]
         intel["agentNotes"] = f"{intel.get('agentNotes', '')} [SHIELD: Government confirmation detected - Risk 12]"
-        logger.info(f"SHIELD GOVERNMENT CONFIRMATION: UIDAI confirmation detected - Risk 12")
+        logger.info("SHIELD GOVERNMENT CONFIRMATION: UIDAI confirmation detected - Risk 12")
         reply = "✅ Safe: Government confirmation (UIDAI)"
         return intel, reply
     elif has_government_shield and has_suspicious_url:
         # Government keywords present BUT also suspicious URL - treat as high risk
-        logger.info(f"GOVERNMENT SHIELD BLOCKED: UIDAI keywords present with suspicious URL")
+        logger.info("GOVERNMENT SHIELD BLOCKED: UIDAI keywords present with suspicious URL")
     
     # =========================================================================
     # v1.2 Titanium RULE 1: Evidence Mandate
     # Trigger: phishingLinks OR upiIds are NOT empty (bank_accounts excluded)
     # If triggered: isPhishing=True, riskScore >= 70
     # =========================================================================
-    has_evidence = len(phishing_links) > 0 or len(upi_ids) > 0
+    has_evidence = bool(phishing_links or upi_ids)
     
     if has_evidence:
         # Build artifact list for agentNotes
@@ -1099,32 +1276,92 @@ def finalize_intelligence(intel: Dict[str, Any], reply: str, message_text: str =
 # Background Tasks (Async)
 # =============================================================================
 
+# Shared keep-alive client for GUVI callbacks (TCP/TLS reused across callbacks)
+_callback_client: Optional[httpx.AsyncClient] = None
+
+# Transient gateway errors are retried so intel isn't lost on a GUVI hiccup
+CALLBACK_RETRIES = 2
+CALLBACK_RETRY_STATUSES = frozenset({502, 503, 504})
+CALLBACK_BACKOFF_SECONDS = 0.2
+
+
+def get_callback_client() -> httpx.AsyncClient:
+    """Get or create the pooled HTTP/2 client used for GUVI callbacks."""
+    global _callback_client
+    if _callback_client is None or _callback_client.is_closed:
+        # The transport retries failed connects; 5xx retries are in send_guvi_callback_async
+        _callback_client = httpx.AsyncClient(
+            timeout=15.0,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=CALLBACK_RETRIES,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+            )
+        )
+    return _callback_client
+
+
+# Strong references to fire-and-forget tasks (the event loop only keeps weak ones)
+_pending_tasks: Set[asyncio.Task] = set()
+
+
+def spawn_background_task(coro) -> asyncio.Task:
+    """
+    Schedule a coroutine on the event loop without awaiting it.
+    
+    Unlike BackgroundTasks this doesn't hold the request open until the work
+    finishes; the task is tracked in _pending_tasks so it isn't garbage
+    collected mid-flight and can be drained on shutdown.
+    """
+    task = asyncio.create_task(coro)
+    _pending_tasks.add(task)
+    task.add_done_callback(_pending_tasks.discard)
+    return task
+
+
+async def drain_background_tasks():
+    """Wait for in-flight background tasks (e.g. GUVI callbacks) to finish."""
+    if _pending_tasks:
+        await asyncio.gather(*_pending_tasks, return_exceptions=True)
+
+
+async def close_callback_client():
+    """Close the GUVI callback client."""
+    if _callback_client and not _callback_client.is_closed:
+        await _callback_client.aclose()
+
+
 async def send_guvi_callback_async(session_id: str, payload: dict):
     """
     Async callback to GUVI webhook.
-    Uses httpx.AsyncClient for non-blocking HTTP request.
+    Uses the shared httpx.AsyncClient so each callback reuses a pooled connection.
+    Connect failures and 502/503/504 responses are retried with exponential backoff.
     
     Validates URL format and handles empty environment variables gracefully.
     """
     # Validate callback URL exists and is properly formatted
     if not GUVI_CALLBACK_URL:
-        logger.debug(f"GUVI Callback skipped: No callback URL configured")
+        logger.debug("GUVI Callback skipped: No callback URL configured")
         return
     
     if not GUVI_CALLBACK_URL.startswith("http"):
-        logger.warning(f"GUVI Callback skipped: Invalid URL format - {GUVI_CALLBACK_URL}")
+        logger.warning("GUVI Callback skipped: Invalid URL format - %s", GUVI_CALLBACK_URL)
         return
     
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
+        client = get_callback_client()
+        for attempt in range(CALLBACK_RETRIES + 1):
             response = await client.post(GUVI_CALLBACK_URL, json=payload)
-            logger.info(f"GUVI Callback for {session_id}: {response.status_code}")
-            if response.status_code >= 400:
-                logger.warning(f"GUVI Callback failed: {response.text}")
+            if response.status_code not in CALLBACK_RETRY_STATUSES or attempt == CALLBACK_RETRIES:
+                break
+            await asyncio.sleep(CALLBACK_BACKOFF_SECONDS * (2 ** attempt))
+        logger.info("GUVI Callback for %s: %s", session_id, response.status_code)
+        if response.status_code >= 400:
+            logger.warning("GUVI Callback failed: %s", response.text)
     except httpx.TimeoutException:
-        logger.error(f"GUVI Callback timeout for {session_id}")
+        logger.error("GUVI Callback timeout for %s", session_id)
     except Exception as e:
-        logger.error(f"GUVI Callback error for {session_id}: {e}")
+        logger.error("GUVI Callback error for %s: %s", session_id, e)
 
 
 # =============================================================================
@@ -1151,8 +1388,9 @@ async def root():
 async def handle_message(
     message_request: HoneypotRequest,
     request: Request,
-    background_tasks: BackgroundTasks,
-    api_key: str = Depends(verify_api_key)
+    response: Response,
+    api_key: str = Depends(verify_api_key),
+    agent: ScamAgent = Depends(get_agent)
 ):
     """
     v1.2 Titanium: Primary endpoint for honeypot scam engagement.
@@ -1172,72 +1410,49 @@ async def handle_message(
     5. Extracts intelligence
     6. Generates response
     7. Saves to database
-    8. Sends callback (non-blocking)
+    8. Sends callback (fire-and-forget task)
     """
     # v1.2 Titanium: Latency tracking start
     start_time = time()
     
+    # Applied to the HoneypotResponse returns; prebuilt bodies and errors set it themselves
+    response.headers.update(NO_STORE_HEADERS)
+    
     # API Key is already validated by Depends(verify_api_key)
-    logger.info(f"API Key validated for request")
+    logger.debug("API Key validated for request")
     
     # v1.2 Titanium: Legacy rate limiting check (session-based)
     session_id = message_request.get_session_id()
     if not check_rate_limit(session_id):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Max 10 requests per minute.")
-    
-    logger.info(f"Processing request for session: {message_request.get_session_id()}")
+        raise HTTPException(status_code=429, detail="Rate limit exceeded. Max 10 requests per minute.", headers=NO_STORE_HEADERS)
     
-    # Get agent from app state
-    agent: ScamAgent = app.state.agent
+    logger.info("Processing request for session: %s", session_id)
     
-    # Extract message text from message_request.message
-    message_data = message_request.message
-    if isinstance(message_data, dict):
-        raw_text = message_data.get("text", "") or message_data.get("content", "")
-    else:
-        raw_text = message_data.get_text()
+    # Resolve the message fields (text/content, sender_id/senderId) once
+    message_fields = message_request.get_message_fields()
+    raw_text = message_fields["text"]
     
     # v1.2 Titanium: Input Normalization (The Filter)
     # Strip whitespace and remove invisible Unicode characters
     message_text = normalize_input(raw_text)
-    logger.info(f"Normalized message: '{message_text[:50]}...' (original length: {len(raw_text)}, normalized length: {len(message_text)})")
+    logger.debug("Normalized message: '%.50s...' (original length: %d, normalized length: %d)", message_text, len(raw_text), len(message_text))
     
     # =====================================================================
     # GUARD 1: Short-Input Short-Circuit
     # If input is too short (< 3 chars), return Safe without calling AI
     # =====================================================================
     if len(message_text) < 3:
-        logger.info(f"Short-input short-circuit: '{message_text}' (length: {len(message_text)})")
-        short_response = {
-            "bankAccounts": [],
-            "upiIds": [],
-            "phishingLinks": [],
-            "phoneNumbers": [],
-            "suspiciousKeywords": [],
-            "aadhaarNumbers": [],
-            "panNumbers": [],
-            "agentNotes": "Input too short for analysis",
-            "scamType": "Safe/Transactional",
-            "urgencyLevel": "Low",
-            "riskScore": 0,
-            "extractedEntities": [],
-            "threatSource": "",
-            "isPhishing": False
-        }
-        return HoneypotResponse(
-            status="success",
-            reply="✅ Safe: Input too short for analysis",
-            intelligence=short_response
-        )
+        logger.info("Short-input short-circuit: '%s' (length: %d)", message_text, len(message_text))
+        return prebuilt_json_response(SHORT_INPUT_BODY)
     
     # =====================================================================
     # TIER 1: SOVEREIGN SHIELDS (Whitelists) - Early Return
     # Check deterministic safe patterns first for performance
     # =====================================================================
-    logger.info(f"[TIER1] Checking Sovereign Shields for message: {message_text[:50]}...")
+    logger.debug("[TIER1] Checking Sovereign Shields for message: %.50s...", message_text)
     tier1_result = check_tier1_sovereign_shields(message_text)
     if tier1_result:
-        logger.info(f"[TIER1] HIT: {tier1_result.get('rule')} - returning immediately")
+        logger.info("[TIER1] HIT: %s - returning immediately", tier1_result.get('rule'))
         intel_response = DEFAULT_INTEL.copy()
         intel_response.update({
             "scamType": tier1_result.get("scamType", "Safe/Transactional"),
@@ -1258,10 +1473,10 @@ async def handle_message(
     # TIER 2: DETERMINISTIC TRAPS (Blacklists) - Early Return
     # Check deterministic scam patterns second for safety
     # =====================================================================
-    logger.info(f"[TIER2] Checking Deterministic Traps for message: {message_text[:50]}...")
+    logger.debug("[TIER2] Checking Deterministic Traps for message: %.50s...", message_text)
     tier2_result = check_tier2_deterministic_traps(message_text)
     if tier2_result:
-        logger.info(f"[TIER2] HIT: {tier2_result.get('rule')} - returning immediately")
+        logger.info("[TIER2] HIT: %s - returning immediately", tier2_result.get('rule'))
         intel_response = DEFAULT_INTEL.copy()
         intel_response.update({
             "scamType": tier2_result.get("scamType", "Confirmed Phishing/Scam"),
@@ -1282,60 +1497,58 @@ async def handle_message(
     # TIER 3: LLM HEURISTICS
     # Only run AI detection if no Tier 1 or Tier 2 rules matched
     # =====================================================================
-    logger.info(f"[TIER3] Checking if AI detection needed for message: {message_text[:50]}...")
-    if not check_tier3_llm_heuristics(message_text):
-        logger.info(f"[TIER3] Skipping AI - Message does not require analysis")
-        short_response = DEFAULT_INTEL.copy()
-        short_response.update({
-            "agentNotes": "Message does not require AI analysis",
-            "scamType": "Safe/Transactional",
-            "riskScore": 5,
-            "urgencyLevel": "Low"
-        })
-        return HoneypotResponse(
-            status="success",
-            reply="✅ Safe: Analysis complete",
-            intelligence=short_response
-        )
-    
+    logger.debug("[TIER3] Checking if AI detection needed for message: %.50s...", message_text)
     history = message_request.get_conversation_history()
-    metadata = message_request.metadata or {}
+    if not check_tier3_llm_heuristics(message_text, has_history=bool(history)):
+        logger.info("[TIER3] Skipping AI - Message does not require analysis")
+        return prebuilt_json_response(NO_ANALYSIS_BODY)
     
     # AUDIT LOGGING: Save EVERY request to database immediately
     # This ensures we capture all incoming messages for debugging/analysis
     # Get sender_id for SMS sender verification
-    sender_id = None
-    if isinstance(message_data, dict):
-        sender_id = message_data.get("sender_id") or message_data.get("senderId")
-    else:
-        sender_id = getattr(message_data, "sender_id", None) or getattr(message_data, "senderId", None)
+    sender_id = message_fields["sender_id"]
     
     new_message = {
-        "sender": message_data.get("sender", "user") if isinstance(message_data, dict) else getattr(message_data, "sender", "user"),
+        "sender": message_fields["sender"],
         "sender_id": sender_id,
         "text": message_text,
-        "timestamp": message_data.get("timestamp", 0) if isinstance(message_data, dict) else getattr(message_data, "timestamp", 0)
+        "timestamp": message_fields["timestamp"]
     }
     
-    await db_manager.update_conversation(
-        session_id=message_request.get_session_id(),
+    # Run the audit write alongside the LLM fan-out instead of ahead of it
+    audit_task = asyncio.create_task(db_manager.update_conversation(
+        session_id=session_id,
         new_messages=[new_message],
         intelligence={"bankAccounts": [], "upiIds": [], "phishingLinks": [], "phoneNumbers": [], "suspiciousKeywords": [], "agentNotes": "", "scamType": "Unknown", "urgencyLevel": "Low", "riskScore": 10, "extractedEntities": [], "threatSource": sender_id or ""}
-    )
+    ))
+    
+    # Only the most recent turns go into the LLM prompt. The agent still regex-scans
+    # the full history, and it all counts towards totalMessagesExchanged.
+    recent_history = history[-MAX_HISTORY_TURNS:] if MAX_HISTORY_TURNS > 0 else history
+    
+    # Join the prompt window + message once for the agent (each turn capped at
+    # MAX_HISTORY_CHARS in the prompt only)
+    full_text = build_full_text(message_text, recent_history, max_turn_chars=MAX_HISTORY_CHARS)
     
     try:
-        # v1.2 Titanium: Step 1 - Extract intelligence with 15s timeout
+        # v1.2 Titanium: Step 1 - Extract intelligence (one LLM call) with 15s timeout.
+        # No separate verdict call: finalize_intelligence builds the reply headline.
         try:
-            intel, reply = await asyncio.wait_for(
-                asyncio.gather(
-                    agent.extract_intelligence(message_text, history, sender_id),
-                    agent.generate_response(message_text, history, metadata)
+            intel = await asyncio.wait_for(
+                agent.extract_intelligence(
+                    message_text,
+                    history,
+                    sender_id,
+                    full_text=full_text,
+                    session_id=session_id
                 ),
                 timeout=15.0  # v1.2: Increased from 8.0 to 15.0 seconds
             )
+            reply = ""
         except asyncio.TimeoutError:
             # v1.2 Titanium: Return 504 Gateway Timeout instead of fallback
             logger.error("AI processing timed out after 15 seconds")
+            await audit_task
             latency_ms = int((time() - start_time) * 1000)
             raise HTTPException(
                 status_code=504,
@@ -1346,117 +1559,43 @@ async def handle_message(
                     "latency_ms": latency_ms,
                     "version": API_VERSION,
                     "timestamp": datetime.utcnow().isoformat()
-                }
+                },
+                headers=NO_STORE_HEADERS
             )
         
         # Step 2: Apply Evidence Guard - cap risk if high but no physical evidence
-        logger.info(f"Before Evidence Guard: riskScore={intel.get('riskScore')}, links={intel.get('phishingLinks')}, upi={intel.get('upiIds')}, bank={intel.get('bankAccounts')}")
+        logger.debug("Before Evidence Guard: riskScore=%s, links=%s, upi=%s, bank=%s", intel.get('riskScore'), intel.get('phishingLinks'), intel.get('upiIds'), intel.get('bankAccounts'))
         intel = apply_evidence_guard(intel)
-        logger.info(f"After Evidence Guard: riskScore={intel.get('riskScore')}, scamType={intel.get('scamType')}")
+        logger.debug("After Evidence Guard: riskScore=%s, scamType=%s", intel.get('riskScore'), intel.get('scamType'))
         
         # Step 3: Update database with extracted intelligence
-        # (initial save already done at top for audit logging)
+        # (audit write must land first so the message is stored before its intel)
+        await audit_task
         await db_manager.update_conversation(
-            session_id=message_request.get_session_id(),
+            session_id=session_id,
             new_messages=[],
             intelligence=intel
         )
         
         # Step 3: Prepare callback payload
-        # Deep Flat Sanitizer: Recursively flattens nested lists and extracts dict values
-        def ensure_list(val):
-            """
-            Deep Flat Sanitizer - Recursive schema guardian for AI-generated data.
-            
-            LLMs return probabilistic output that often violates Pydantic schema requirements,
-            causing 400 Bad Request errors. This function recursively traverses nested
-            structures (lists of lists, dict-wrapped values, MongoDB $addToSet artifacts)
-            and extracts only string values into a flat list.
-            
-            TRANSFORMATION MATRIX:
-            ----------------------
-            Input Type              | Output
-            ------------------------|---------------------------
-            [['url1', 'url2']]      | ['url1', 'url2']
-            [{'link': 'url1'}]      | ['url1']
-            {'0': 'link1', '1': ...}| ['link1', ...]
-            'string'                | [] (strings not in list)
-            None                    | []
-            123 (int)               | [] (non-strings ignored)
-            
-            ALGORITHM:
-            ----------
-            1. Initialize empty result list
-            2. Define recursive flatten() helper:
-               - If list: recurse on each element
-               - If dict: recurse on each value (ignore keys)
-               - If string: append to result
-               - Else: ignore (numbers, booleans, None)
-            3. Execute flatten(val) and return result
-            
-            USE CASES:
-            ----------
-            - MongoDB $addToSet operations requiring array input for $each
-            - Pydantic model validation requiring List[str] types
-            - React Native/Expo frontend compatibility (flat JSON arrays)
-            - AI output sanitization before database persistence
-            
-            Args:
-                val: Any value from AI extraction or database query.
-                     Commonly: list, dict, nested list, None, or unexpected types.
-            
-            Returns:
-                List[str]: Flat list containing only string values extracted from
-                          nested structures. Guaranteed never nested, never containing
-                          dicts, and always iterable by React Native FlatList.
-            
-            Example:
-                >>> ensure_list([['netflix.com', 'evil.com']])
-                ['netflix.com', 'evil.com']
-                >>> ensure_list({'link': 'phishing.com', 'upi': 'user@upi'})
-                ['phishing.com', 'user@upi']
-            """
-            if val is None:
-                return []
-            
-            result = []
-            
-            def flatten(item):
-                if isinstance(item, list):
-                    for subitem in item:
-                        flatten(subitem)
-                elif isinstance(item, dict):
-                    for subval in item.values():
-                        flatten(subval)
-                elif isinstance(item, str):
-                    result.append(item)
-                # Ignore numbers, booleans, etc.
-            
-            flatten(val)
-            return result
-        
         # Build clean intel dict for logging and response
         # Deduplicate UPIs and links (Fix 3: Entity Deduplication)
         # v1.3.0: Added aadhaarNumbers and panNumbers
-        intel_dict = {
-            "bankAccounts": ensure_list(intel.get("bankAccounts", [])),
-            "upiIds": list(set(ensure_list(intel.get("upiIds", [])))),
-            "phishingLinks": list(set(ensure_list(intel.get("phishingLinks", [])))),
-            "phoneNumbers": ensure_list(intel.get("phoneNumbers", [])),
-            "suspiciousKeywords": ensure_list(intel.get("suspiciousKeywords", [])),
-            "aadhaarNumbers": ensure_list(intel.get("aadhaarNumbers", [])),
-            "panNumbers": ensure_list(intel.get("panNumbers", [])),
+        intel_dict = {key: ensure_list(intel.get(key)) for key in INTEL_LIST_KEYS}
+        for key in DEDUP_INTEL_KEYS:
+            intel_dict[key] = list(dict.fromkeys(intel_dict[key]))
+        intel_dict.update({
             "agentNotes": intel.get("agentNotes", ""),
             "scamType": intel.get("scamType", "Unknown"),
             "urgencyLevel": intel.get("urgencyLevel", "Low"),
             "riskScore": intel.get("riskScore", 0),
-            "extractedEntities": list(set(ensure_list(intel.get("extractedEntities", []))))
-        }
+            "extractedEntities": list(dict.fromkeys(ensure_list(intel.get("extractedEntities", []))))
+        })
         
         # Apply Synchronization Rules: Boolean Sync, Note-Evidence Link, Reply-Score Sanitization
         intel_dict, reply = finalize_intelligence(intel_dict, reply, message_text)
         
-        logger.info(f"FINAL INTEL OBJECT: {intel_dict}")
+        logger.debug("FINAL INTEL OBJECT: %s", intel_dict)
         
         # =========================================================================
         # v1.3.2 SAFE-PASS GATE - PRIORITY 1
@@ -1491,10 +1630,8 @@ async def handle_message(
                 intel_dict["scamType"] = "Safe/Transactional"
                 intel_dict["urgencyLevel"] = "Low"
                 reply = "✅ Safe: Legitimate OTP message with security warning"
-                logger.info(f"SAFE-PASS: Legitimate OTP with warning - Score {risk_score}")
+                logger.info("SAFE-PASS: Legitimate OTP with warning - Score %s", risk_score)
                 # RETURN immediately - don't run phishing traps
-                ext_intel = IntelligenceData(**intel_dict)
-                
                 # Build response
                 latency_ms = int((time() - start_time) * 1000)
                 response_data = {
@@ -1513,17 +1650,17 @@ async def handle_message(
             # Scam: OTP + share/request
             if "otp" in t_low and any(w in t_low for w in ["share", "provide", "verify", "executive"]):
                 risk_score = max(risk_score, 70)
-                logger.info(f"PHISHING TRAP: OTP + request -> Risk {risk_score}")
+                logger.info("PHISHING TRAP: OTP + request -> Risk %s", risk_score)
             
             # Scam: Financial data request
             if any(w in t_low for w in ["card details", "cvv", "expiry", "card number"]) and "address" in t_low:
                 risk_score = max(risk_score, 80)
-                logger.info(f"PHISHING TRAP: Financial data request -> Risk {risk_score}")
+                logger.info("PHISHING TRAP: Financial data request -> Risk %s", risk_score)
             
             # Scam: ID Theft KYC
             if any(w in t_low for w in ["aadhaar", "pan card", "pan number"]) and any(w in t_low for w in ["kyc", "verify", "update"]):
                 risk_score = max(risk_score, 72)
-                logger.info(f"PHISHING TRAP: ID Theft KYC request -> Risk {risk_score}")
+                logger.info("PHISHING TRAP: ID Theft KYC request -> Risk %s", risk_score)
             
             # Update intelligence object
             intel_dict["riskScore"] = risk_score
@@ -1534,27 +1671,27 @@ async def handle_message(
                 reply = f"❌ Danger: High risk scam detected (Score: {risk_score})"
             
         except Exception as e:
-            logger.warning(f"SAFE-PASS GATE ERROR: {e}")
-        
-        ext_intel = IntelligenceData(**intel_dict)
+            logger.warning("SAFE-PASS GATE ERROR: %s", e)
         
         # Only send callback if scam detected
+        # (IntelligenceData validation is only needed for the callback payload)
         is_scam = intel.get("riskScore", 0) > 30
         if is_scam:
+            ext_intel = IntelligenceData(**intel_dict)
             callback_payload = {
-                "sessionId": message_request.get_session_id(),
+                "sessionId": session_id,
                 "scamDetected": True,
                 "totalMessagesExchanged": len(history) + 1,
                 "extractedIntelligence": ext_intel.model_dump(),
                 "agentNotes": intel.get("agentNotes", "Scammer engaged.")
             }
-            background_tasks.add_task(send_guvi_callback_async, message_request.get_session_id(), callback_payload)
+            spawn_background_task(send_guvi_callback_async(session_id, callback_payload))
         
         # v1.2 Titanium: Calculate latency
         latency_ms = int((time() - start_time) * 1000)
         
         # v1.2 Titanium: Step 4 - Return response with telemetry
-        logger.info(f"RETURNING RESPONSE: reply={reply}, intel={intel_dict}, latency={latency_ms}ms")
+        logger.debug("RETURNING RESPONSE: reply=%s, intel=%s, latency=%sms", reply, intel_dict, latency_ms)
         
         # Build response with v1.2 Titanium telemetry
         response_data = {
@@ -1573,7 +1710,8 @@ async def handle_message(
         raise
     except Exception as e:
         # v1.2 Titanium: Return structured error response
-        logger.exception(f"Error processing request: {e}")
+        logger.exception("Error processing request: %s", e)
+        await audit_task
         latency_ms = int((time() - start_time) * 1000)
         raise HTTPException(
             status_code=500,
@@ -1584,10 +1722,30 @@ async def handle_message(
                 "latency_ms": latency_ms,
                 "version": API_VERSION,
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            },
+            headers=NO_STORE_HEADERS
         )
 
 
+@app.post("/batch_extract", response_model=BatchExtractResponse)
+@limiter.limit("10/minute")
+async def batch_extract(
+    batch_request: BatchExtractRequest,
+    request: Request,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Bulk regex entity extraction for offline re-analysis.
+    
+    Scans every transcript for UPI IDs, links, bank accounts, phone numbers,
+    Aadhaar and PAN numbers without calling the LLM. The scan runs in a
+    worker thread so large batches don't stall the event loop.
+    """
+    texts = [normalize_input(text) for text in batch_request.transcripts]
+    results = await asyncio.to_thread(extract_entities_batch, texts)
+    return BatchExtractResponse(status="success", results=results)
+
+
 # =============================================================================
 # Startup Event
 # =============================================================================
@@ -1595,4 +1753,18 @@ async def handle_message(
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Rate limits, caches and the in-memory DB fallback are per process,
+    # so multiple workers are opt-in. WEB_CONCURRENCY (the variable PaaS hosts
+    # and the uvicorn CLI use) takes precedence over WORKERS.
+    workers = int(os.getenv("WEB_CONCURRENCY") or os.getenv("WORKERS", "1"))
+    # An import string (not the app object) is required for workers > 1;
+    # each worker builds its own clients in the lifespan hook after forking
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        # uvloop isn't available on Windows; "auto" falls back to asyncio there
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
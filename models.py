@@ -104,6 +104,28 @@ class HoneypotRequest(BaseModel):
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         return self.conversation_history or self.conversationHistory or []
     
+    def get_message_fields(self) -> Dict[str, Any]:
+        """
+        Resolve the current message into one plain dict (text, sender, sender_id, timestamp).
+        
+        The message may arrive as a raw dict or a MessageContent model with either
+        field spelling; this resolves the aliases once per request.
+        """
+        msg = self.message
+        if isinstance(msg, MessageContent):
+            return {
+                "text": msg.get_text(),
+                "sender": msg.sender,
+                "sender_id": msg.get_sender_id(),
+                "timestamp": msg.timestamp
+            }
+        return {
+            "text": msg.get("text", "") or msg.get("content", "") or "",
+            "sender": msg.get("sender", "user"),
+            "sender_id": msg.get("sender_id") or msg.get("senderId"),
+            "timestamp": msg.get("timestamp", 0)
+        }
+    
     class Config:
         extra = "allow"
 
@@ -156,6 +178,21 @@ class CallbackPayload(BaseModel):
         extra = "allow"
 
 
+class BatchExtractRequest(BaseModel):
+    """Bulk entity-extraction request for offline re-analysis."""
+    transcripts: List[str] = Field(
+        ...,
+        max_length=1000,
+        description="Transcripts to scan (max 1000 per request)"
+    )
+
+
+class BatchExtractResponse(BaseModel):
+    """Per-transcript regex entities, in request order."""
+    status: str = "success"
+    results: List[Dict[str, List[str]]] = Field(default_factory=list)
+
+
 class ErrorResponse(BaseModel):
     """Standard error response schema."""
     status: str = "error"